@@ -1,20 +1,82 @@
+from __future__ import annotations
+
 import logging
-import inspect
-from typing import Dict, Any, List, Callable
+from functools import cached_property
+from typing import TYPE_CHECKING, Dict, Any, List, Callable
 from abc import ABC, abstractmethod
-from langchain.agents import AgentExecutor, create_tool_calling_agent
-from langchain.prompts import ChatPromptTemplate
-from langchain_core.tools import tool, BaseTool
+
+if TYPE_CHECKING:
+    from langchain.agents import AgentExecutor
+    from langchain_core.tools import BaseTool
 
 logger = logging.getLogger(__name__)
 
+# Process-level cache of built executors. Building an executor runs prompt
+# construction, create_tool_calling_agent and AgentExecutor validation, which
+# is expensive when sub-agents are re-created lazily across orchestrator runs.
+# Keyed on (agent class, llm identity, tool names, prompt text, executor
+# settings); a plain dict with FIFO eviction since the llm/tools arguments are
+# not hashable for functools.lru_cache.
+_EXECUTOR_CACHE: Dict[tuple, "AgentExecutor"] = {}
+_EXECUTOR_CACHE_MAX = 32
+
+# Wrapped-tool cache. The @tool decorator runs pydantic schema inference per
+# function, paid on the critical path when sub-agents are constructed lazily
+# inside an orchestrator tool call. Keyed on (class, llm, config) identity so
+# a re-created agent for the same stack reuses its tools while a different
+# stack (other config object) builds its own. Values hold strong references
+# to the llm and config alongside the tools: while an entry is alive the
+# keyed objects can't be garbage-collected, so their ids can't be recycled
+# onto unrelated objects and produce false hits.
+_TOOLS_CACHE: Dict[tuple, tuple] = {}
+_TOOLS_CACHE_MAX = 32
+
+# Whether the process-wide langchain LLM cache has been configured
+_LLM_CACHE_CONFIGURED = False
+
+
+def _maybe_enable_llm_cache(config: Dict[str, Any]) -> None:
+    """
+    Enable langchain's global LLM cache when agents.llm_cache is set.
+
+    With the cache on, repeating an invoke with identical prompts (common
+    during dev/test loops and orchestrator retries) is answered from SQLite
+    without an LLM call; tool executions still run, which is the correct
+    behavior. Configured once per process.
+    """
+    global _LLM_CACHE_CONFIGURED
+    if _LLM_CACHE_CONFIGURED:
+        return
+
+    agents_config = config.get('agents', {})
+    if not agents_config.get('llm_cache', False):
+        return
+
+    try:
+        from langchain_core.globals import set_llm_cache
+        from langchain_community.cache import SQLiteCache
+    except ImportError as e:
+        logger.warning(f"LLM cache requested but not available: {e}")
+        return
 
-class Agent(ABC):    
+    cache_path = agents_config.get('llm_cache_path', '.agent_cache.sqlite')
+    set_llm_cache(SQLiteCache(database_path=cache_path))
+    _LLM_CACHE_CONFIGURED = True
+    logger.info(f"LLM response cache enabled at {cache_path}")
+
+
+class Agent(ABC):
     """
     Base Agent Class for Multi-Agent System
     This class provides a template for creating agents with specific roles,
     tools, and behaviors in a multi-agent environment.
     """
+
+    # Iteration cap used when config doesn't set agents.max_iterations.
+    # Subclasses override this: every extra iteration is a full LLM
+    # round-trip, so narrow agents get tighter caps.
+    default_max_iterations = 15
+
     def __init__(self, llm, config: Dict[str, Any], agent_name: str):
         """
         Initialize the base agent.
@@ -27,7 +89,20 @@ class Agent(ABC):
         self.llm = llm
         self.config = config
         self.agent_name = agent_name
-        self.tools = self._create_tools()
+
+        _maybe_enable_llm_cache(config)
+
+        tools_key = (type(self), id(llm), id(config))
+        cached = _TOOLS_CACHE.get(tools_key)
+        if cached is not None:
+            logger.debug(f"{self.agent_name}: Reusing cached tools")
+            self.tools = cached[2]
+        else:
+            self.tools = self._create_tools()
+            if len(_TOOLS_CACHE) >= _TOOLS_CACHE_MAX:
+                _TOOLS_CACHE.pop(next(iter(_TOOLS_CACHE)))
+            _TOOLS_CACHE[tools_key] = (llm, config, self.tools)
+
         self.agent = self._create_agent()
 
         logger.debug(f"{self.agent_name} initialized with {len(self.tools)} tools")
@@ -49,6 +124,10 @@ class Agent(ABC):
         Args:
             tool_functions: List of functions to wrap
         """
+        # Imported lazily: pulling in langchain costs hundreds of ms of
+        # startup time that code paths not building tools shouldn't pay.
+        from langchain_core.tools import tool
+
         wrapped_tools = []
         
         for func in tool_functions:
@@ -76,34 +155,115 @@ class Agent(ABC):
             System prompt string
         """
         pass
-    
+
+    @cached_property
+    def system_prompt(self) -> str:
+        """
+        The agent's system prompt, computed once per instance.
+
+        Subclass prompts are sizeable static strings; caching avoids
+        re-building them for every consumer (prompt template, executor
+        cache key).
+        """
+        return self._get_system_prompt()
+
+
+    def _build_system_message(self):
+        """
+        Build the system message, with provider-level prompt caching when enabled.
+
+        The system prompt is static but is resent on every LLM call, including
+        every intermediate tool-call turn inside the executor. For Anthropic
+        models a cache_control marker lets the provider serve the prefix from
+        its cache; OpenAI caches stable prefixes automatically, so a plain
+        system message is already optimal there.
+
+        Returns:
+            Message (or tuple) suitable for ChatPromptTemplate.from_messages
+        """
+        from langchain_core.messages import SystemMessage
+
+        system_prompt = self.system_prompt
+
+        if self.config.get('agents', {}).get('cache_system_prompt', True):
+            provider = type(self.llm).__name__.lower()
+            if 'anthropic' in provider:
+                return SystemMessage(content=[{
+                    "type": "text",
+                    "text": system_prompt,
+                    "cache_control": {"type": "ephemeral"}
+                }])
+
+        return ("system", system_prompt)
+
     def _create_agent(self) -> AgentExecutor:
         """
         Create the agent executor with tools and prompt.
-        
+
         This method uses the system prompt and tools to create a LangChain
         agent executor. Override if you need custom agent behavior.
-        
+
         Returns:
             Configured AgentExecutor instance
         """
+        from langchain.agents import AgentExecutor, create_tool_calling_agent
+        from langchain.prompts import ChatPromptTemplate
+
+        verbose = self.config.get('agents', {}).get('verbose', False)
+        max_iterations = self._get_max_iterations()
+
+        # id(self.tools) distinguishes same-named tool closures built from
+        # different configs (multi-stack use); the list is pinned by
+        # _TOOLS_CACHE and by the cached executor itself, so the id is
+        # stable for the life of the entry.
+        cache_key = (
+            type(self).__name__,
+            id(self.llm),
+            id(self.tools),
+            tuple(t.name for t in self.tools),
+            self.system_prompt,
+            verbose,
+            max_iterations
+        )
+        cached = _EXECUTOR_CACHE.get(cache_key)
+        if cached is not None:
+            logger.debug(f"{self.agent_name}: Reusing cached agent executor")
+            return cached
+
         prompt = ChatPromptTemplate.from_messages([
-            ("system", self._get_system_prompt()),
+            self._build_system_message(),
             ("human", "{input}"),
             ("placeholder", "{agent_scratchpad}"),
         ])
-        
+
         agent = create_tool_calling_agent(self.llm, self.tools, prompt)
-        
-        return AgentExecutor(
+
+        executor = AgentExecutor(
             agent=agent,
             tools=self.tools,
-            verbose=self.config.get('agents', {}).get('verbose', False),
-            max_iterations=self.config.get('agents', {}).get('max_iterations', 15),
+            verbose=verbose,
+            max_iterations=max_iterations,
+            early_stopping_method="force",
             handle_parsing_errors=True,
             return_intermediate_steps=False
         )
+
+        if len(_EXECUTOR_CACHE) >= _EXECUTOR_CACHE_MAX:
+            _EXECUTOR_CACHE.pop(next(iter(_EXECUTOR_CACHE)))
+        _EXECUTOR_CACHE[cache_key] = executor
+
+        return executor
     
+    def _get_max_iterations(self) -> int:
+        """
+        Resolve the iteration cap for this agent.
+
+        Returns:
+            agents.max_iterations from config when set, otherwise the
+            per-agent class default
+        """
+        return self.config.get('agents', {}).get('max_iterations', self.default_max_iterations)
+
     def get_tool_names(self) -> List[str]:
         """
         Get the names of all tools available to this agent.
@@ -133,7 +293,7 @@ class Agent(ABC):
             'name': self.agent_name,
             'tool_count': self.get_tool_count(),
             'tool_names': self.get_tool_names(),
-            'max_iterations': self.config.get('agents', {}).get('max_iterations', 5),
+            'max_iterations': self._get_max_iterations(),
             'verbose': self.config.get('agents', {}).get('verbose', False)
         }
     
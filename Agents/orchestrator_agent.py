@@ -1,6 +1,11 @@
+import asyncio
+import concurrent.futures
 import logging
 import subprocess
+import threading
 import os
+from collections import deque
+from types import SimpleNamespace
 from typing import Dict, Any
 from pathlib import Path
 from .utils import (
@@ -17,7 +22,9 @@ logger = logging.getLogger(__name__)
 
 class OrchestratorAgent(Agent):
     """Main orchestrator agent that manages the entire WordPress installation."""
-    
+
+    default_max_iterations = 10
+
     def __init__(self, llm, config: Dict[str, Any]):
         """
         Initialize Orchestrator Agent.
@@ -31,9 +38,175 @@ class OrchestratorAgent(Agent):
         self.project_name = self.docker_config['project_name']
         self.mysql_agent = None
         self.webserver_agent = None
+        # Frozen once; read by tool closures on every invocation
+        self._wp = SimpleNamespace(
+            port=config['wordpress']['port'],
+            version=config['wordpress']['version']
+        )
+        self._validation_results = {}
+        # Futures for in-flight background validations, each backed by a
+        # daemon thread so abandoned ones can't block process exit
+        self._validation_futures = {}
+        self._docker_client = None
+        self._compose_client = self._create_compose_client()
+        self._installation_summary = self._build_installation_summary(config)
         super().__init__(llm, config, agent_name="OrchestratorAgent")
-        
-    
+
+
+    def _build_installation_summary(self, config: Dict[str, Any]) -> str:
+        """Render the installation summary once; the config never changes mid-run."""
+        wp = config['wordpress']
+        mysql = config['mysql']
+
+        return f"""
+                    WordPress Installation Summary:
+                    ================================
+                    WordPress URL: http://localhost:{wp['port']}
+                    WordPress Version: {wp['version']}
+
+                    Database Configuration:
+                    - Database Name: {mysql['database']['name']}
+                    - Database User: {mysql['database']['user']}
+                    - MySQL Version: {mysql['version']}
+
+                    Admin Credentials (for WordPress setup):
+                    - Username: {wp['admin']['user']}
+                    - Email: {wp['admin']['email']}
+                    - Password: {wp['admin']['password']}
+
+                    Docker Configuration:
+                    - Project Name: {self.docker_config['project_name']}
+                    - Compose File: {self.compose_file}
+                    """
+
+
+    def _spawn_validation(self, key: str, agent) -> None:
+        """
+        Run a sub-agent validation on a daemon thread.
+
+        ThreadPoolExecutor workers are non-daemon and get joined at
+        interpreter shutdown, so a validation the model started but never
+        polled would hold the process open until its whole LLM loop
+        finished. A daemon thread feeding a self-managed Future keeps the
+        same poll interface while letting abandoned validations die with
+        the process.
+        """
+        future = concurrent.futures.Future()
+
+        def _worker():
+            try:
+                future.set_result(asyncio.run(agent.validate_and_fix()))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(
+            target=_worker,
+            name=f"validation-{key}",
+            daemon=True
+        ).start()
+        self._validation_futures[key] = future
+
+
+    def _discard_background_validations(self) -> None:
+        """
+        Drop any unpolled background validations at the end of a run.
+
+        The workers are daemon threads, so abandoned validations cannot
+        block interpreter shutdown; this just logs what was never collected
+        and clears the futures.
+        """
+        if self._validation_futures:
+            logger.warning(
+                f"Discarding unpolled background validations: {sorted(self._validation_futures)}"
+            )
+            self._validation_futures.clear()
+
+
+    def _get_docker_client(self):
+        """Return a cached Docker client, connecting to the daemon only once."""
+        if self._docker_client is None:
+            self._docker_client = get_docker_client()
+        return self._docker_client
+
+
+    def _create_compose_client(self):
+        """
+        Create an in-process compose client if python-on-whales is available.
+
+        The in-process client reuses the established Docker daemon connection
+        instead of forking the docker-compose binary (which re-initializes an
+        interpreter and re-parses the compose file) on every up/down call.
+
+        Returns:
+            python_on_whales.DockerClient instance, or None to fall back to
+            the docker-compose CLI
+        """
+        try:
+            from python_on_whales import DockerClient as ComposeClient
+        except ImportError:
+            logger.debug("python-on-whales not installed, using docker-compose CLI")
+            return None
+
+        return ComposeClient(
+            compose_files=[self.compose_file],
+            compose_project_name=self.project_name
+        )
+
+
+    def _run_compose_command(self, args: list, timeout: int) -> tuple:
+        """
+        Run a docker-compose CLI command, streaming its output.
+
+        docker-compose can emit megabytes of image-pull progress; buffering it
+        all with capture_output inflates memory and hides progress until the
+        end. Stream line by line instead, logging at debug level and keeping
+        only the last 200 lines for the returned report.
+
+        Args:
+            args: Compose subcommand and flags (e.g. ["up", "-d"])
+            timeout: Maximum seconds to wait for the command
+
+        Returns:
+            Tuple of (return_code, tail_of_output)
+        """
+        cmd = ["docker-compose", "-f", self.compose_file, "-p", self.project_name] + args
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1
+        )
+        tail = deque(maxlen=200)
+
+        # The streaming loop blocks on the pipe, so a compose that stalls
+        # without emitting output (e.g. a wedged daemon) would hang it past
+        # any deadline. A timer kills the process at the timeout, which EOFs
+        # the pipe and unblocks the loop.
+        timed_out = threading.Event()
+
+        def _kill_on_timeout():
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(timeout, _kill_on_timeout)
+        timer.start()
+        try:
+            for line in proc.stdout:
+                line = line.rstrip('\n')
+                logger.debug(f"docker-compose: {line}")
+                tail.append(line)
+            returncode = proc.wait()
+        finally:
+            timer.cancel()
+            proc.stdout.close()
+
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout)
+
+        return returncode, "\n".join(tail)
+
+
     def _create_tools(self):
         """Create tools for Orchestrator agent."""
         
@@ -55,7 +228,7 @@ class OrchestratorAgent(Agent):
         def check_docker_running() -> str:
             """Check if Docker daemon is running."""
             try:
-                client = get_docker_client()
+                client = self._get_docker_client()
                 info = client.info()
                 return f"SUCCESS: Docker is running. Version: {info.get('ServerVersion', 'unknown')}"
             except Exception as e:
@@ -64,7 +237,7 @@ class OrchestratorAgent(Agent):
         def check_existing_containers() -> str:
             """Check if WordPress containers already exist."""
             try:
-                client = get_docker_client()
+                client = self._get_docker_client()
                 containers = client.containers.list(all=True, filters={"name": "wordpress"})
                 
                 if containers:
@@ -79,14 +252,20 @@ class OrchestratorAgent(Agent):
         
         def docker_compose_up() -> str:
             """Start WordPress stack using docker-compose."""
+            if self._compose_client is not None:
+                try:
+                    self._compose_client.compose.up(detach=True)
+                    return "SUCCESS: Docker Compose started."
+                except Exception as e:
+                    return f"FAILED: Docker Compose failed.\nError: {str(e)}"
+
             try:
-                cmd = ["docker-compose", "-f", self.compose_file, "-p", self.project_name, "up", "-d"]
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
-                
-                if result.returncode == 0:
-                    return f"SUCCESS: Docker Compose started.\nOutput: {result.stdout}"
+                returncode, output = self._run_compose_command(["up", "-d"], timeout=120)
+
+                if returncode == 0:
+                    return f"SUCCESS: Docker Compose started.\nOutput: {output}"
                 else:
-                    return f"FAILED: Docker Compose failed.\nError: {result.stderr}\nOutput: {result.stdout}"
+                    return f"FAILED: Docker Compose failed.\nOutput: {output}"
             except subprocess.TimeoutExpired:
                 return "FAILED: Docker Compose command timed out after 120 seconds."
             except Exception as e:
@@ -94,41 +273,91 @@ class OrchestratorAgent(Agent):
         
         def docker_compose_down() -> str:
             """Stop WordPress stack using docker-compose."""
+            if self._compose_client is not None:
+                try:
+                    self._compose_client.compose.down()
+                    return "SUCCESS: Docker Compose stopped."
+                except Exception as e:
+                    return f"WARNING: Docker Compose down had issues.\nError: {str(e)}"
+
             try:
-                cmd = ["docker-compose", "-f", self.compose_file, "-p", self.project_name, "down"]
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-                
-                if result.returncode == 0:
-                    return f"SUCCESS: Docker Compose stopped.\nOutput: {result.stdout}"
+                returncode, output = self._run_compose_command(["down"], timeout=60)
+
+                if returncode == 0:
+                    return f"SUCCESS: Docker Compose stopped.\nOutput: {output}"
                 else:
-                    return f"WARNING: Docker Compose down had issues.\nError: {result.stderr}"
+                    return f"WARNING: Docker Compose down had issues.\nOutput: {output}"
             except Exception as e:
                 return f"ERROR: Could not stop docker-compose: {str(e)}"
         
         def docker_compose_restart() -> str:
             """Restart WordPress stack using docker-compose."""
+            # Kick off pulls of missing images in the background so they
+            # overlap the teardown; by the time `down` finishes the images
+            # are local and `up -d` doesn't stall on a cold cache. Images
+            # already present are left alone - the common restart shouldn't
+            # touch the registry, and re-pulling a floating tag like :latest
+            # could silently swap the image mid-restart.
+            import docker
+
+            pull_procs = []
+            for image in (f"mysql:{self.config['mysql']['version']}",
+                          f"wordpress:{self.config['wordpress']['version']}"):
+                try:
+                    self._get_docker_client().images.get(image)
+                    continue
+                except docker.errors.ImageNotFound:
+                    pass
+                except Exception as e:
+                    logger.debug(f"Could not check for local image {image}: {e}")
+                    continue
+
+                try:
+                    pull_procs.append(subprocess.Popen(
+                        ["docker", "pull", image],
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.DEVNULL
+                    ))
+                except Exception as e:
+                    logger.debug(f"Background pull of {image} not started: {e}")
+
+            def _wait_for_pulls():
+                for proc in pull_procs:
+                    try:
+                        proc.wait(timeout=120)
+                    except subprocess.TimeoutExpired:
+                        proc.kill()
+
+            if self._compose_client is not None:
+                try:
+                    self._compose_client.compose.down()
+                    _wait_for_pulls()
+                    self._compose_client.compose.up(detach=True)
+                    return "SUCCESS: Docker Compose restarted."
+                except Exception as e:
+                    return f"FAILED: Docker Compose restart failed.\nError: {str(e)}"
+
             try:
-                # Stop first
-                subprocess.run(
-                    ["docker-compose", "-f", self.compose_file, "-p", self.project_name, "down"],
-                    capture_output=True, text=True, timeout=60
-                )
-                
+                # Stop first, waiting for the overlapped pulls before starting
+                self._run_compose_command(["down"], timeout=60)
+                _wait_for_pulls()
+
                 # Start again
-                result = subprocess.run(
-                    ["docker-compose", "-f", self.compose_file, "-p", self.project_name, "up", "-d"],
-                    capture_output=True, text=True, timeout=120
-                )
-                
-                if result.returncode == 0:
-                    return f"SUCCESS: Docker Compose restarted.\nOutput: {result.stdout}"
+                returncode, output = self._run_compose_command(["up", "-d"], timeout=120)
+
+                if returncode == 0:
+                    return f"SUCCESS: Docker Compose restarted.\nOutput: {output}"
                 else:
-                    return f"FAILED: Docker Compose restart failed.\nError: {result.stderr}"
+                    return f"FAILED: Docker Compose restart failed.\nOutput: {output}"
             except Exception as e:
                 return f"FAILED: Could not restart docker-compose: {str(e)}"
         
         def validate_mysql_setup() -> str:
             """Run MySQL agent to validate database setup."""
+            cached = self._validation_results.get('mysql')
+            if cached is not None:
+                return f"NOTE: MySQL validation already ran this session. Previous result:\n{cached}"
+
             try:
                 if not self.mysql_agent:
                     logger.info("Creating MySQL Agent for validation...")
@@ -136,11 +365,13 @@ class OrchestratorAgent(Agent):
                     logger.info("MySQL Agent created successfully")
                 
                 logger.info("Running MySQL Agent validation...")
-                result = self.mysql_agent.validate_and_fix()
+                result = asyncio.run(self.mysql_agent.validate_and_fix())
                 logger.info(f"MySQL Agent validation completed: {result['status']}")
                 
                 if result['status'] == 'success':
-                    return f"SUCCESS: MySQL validation completed.\n{result['output']}"
+                    summary = f"SUCCESS: MySQL validation completed.\n{result['output']}"
+                    self._validation_results['mysql'] = summary
+                    return summary
                 else:
                     return f"FAILED: MySQL validation failed.\n{result.get('error', 'Unknown error')}"
             except Exception as e:
@@ -148,6 +379,10 @@ class OrchestratorAgent(Agent):
         
         def validate_webserver_setup() -> str:
             """Run Web Server agent to validate Apache/PHP setup."""
+            cached = self._validation_results.get('webserver')
+            if cached is not None:
+                return f"NOTE: Web Server validation already ran this session. Previous result:\n{cached}"
+
             try:
                 if not self.webserver_agent:
                     logger.info("Creating Web Server Agent for validation...")
@@ -155,47 +390,124 @@ class OrchestratorAgent(Agent):
                     logger.info("Web Server Agent created successfully")
                 
                 logger.info("Running Web Server Agent validation...")
-                result = self.webserver_agent.validate_and_fix()
+                result = asyncio.run(self.webserver_agent.validate_and_fix())
                 logger.info(f"Web Server Agent validation completed: {result['status']}")
                 
                 if result['status'] == 'success':
-                    return f"SUCCESS: Web Server validation completed.\n{result['output']}"
+                    summary = f"SUCCESS: Web Server validation completed.\n{result['output']}"
+                    self._validation_results['webserver'] = summary
+                    return summary
                 else:
                     return f"FAILED: Web Server validation failed.\n{result.get('error', 'Unknown error')}"
             except Exception as e:
                 return f"ERROR: Could not run Web Server agent: {str(e)}"
         
+        async def _gather_validations() -> list:
+            """Run both sub-agent validations concurrently."""
+            return await asyncio.gather(
+                self.mysql_agent.validate_and_fix(),
+                self.webserver_agent.validate_and_fix(),
+                return_exceptions=True
+            )
+
+        def validate_all_services() -> str:
+            """
+            Validate MySQL and Web Server setups concurrently.
+
+            Runs both sub-agents in parallel since they operate on independent
+            containers. Much faster than calling validate_mysql_setup and
+            validate_webserver_setup one after the other.
+            """
+            if 'mysql' in self._validation_results and 'webserver' in self._validation_results:
+                return ("NOTE: Both validations already ran this session. Previous results:\n\n"
+                        f"=== MySQL ===\n{self._validation_results['mysql']}\n\n"
+                        f"=== Web Server ===\n{self._validation_results['webserver']}")
+
+            try:
+                if not self.mysql_agent:
+                    logger.info("Creating MySQL Agent for validation...")
+                    self.mysql_agent = MySQLAgent(self.llm, self.config)
+                if not self.webserver_agent:
+                    logger.info("Creating Web Server Agent for validation...")
+                    self.webserver_agent = WebServerAgent(self.llm, self.config)
+
+                logger.info("Running MySQL and Web Server validations in parallel...")
+                results = asyncio.run(_gather_validations())
+
+                sections = []
+                for key, label, result in zip(["mysql", "webserver"], ["MySQL", "Web Server"], results):
+                    if isinstance(result, Exception):
+                        sections.append(f"=== {label} ===\nERROR: Validation raised: {result}")
+                    elif result['status'] == 'success':
+                        summary = f"SUCCESS: Validation completed.\n{result['output']}"
+                        self._validation_results[key] = summary
+                        sections.append(f"=== {label} ===\n{summary}")
+                    else:
+                        sections.append(f"=== {label} ===\nFAILED: Validation failed.\n{result.get('error', 'Unknown error')}")
+
+                return "\n\n".join(sections)
+            except Exception as e:
+                return f"ERROR: Could not run parallel validation: {str(e)}"
+
+        def start_validations_in_background() -> str:
+            """
+            Start MySQL and Web Server validations in background workers.
+
+            Returns immediately with task ids for poll_validation, so other
+            work (summary, URL reporting) can proceed while the long
+            validations run. When there is nothing else to do,
+            validate_all_services is the simpler choice.
+            """
+            try:
+                if not self.mysql_agent:
+                    self.mysql_agent = MySQLAgent(self.llm, self.config)
+                if not self.webserver_agent:
+                    self.webserver_agent = WebServerAgent(self.llm, self.config)
+
+                for key, agent in (("mysql", self.mysql_agent),
+                                   ("webserver", self.webserver_agent)):
+                    if key not in self._validation_futures:
+                        self._spawn_validation(key, agent)
+
+                return ("Validations started in background. Check progress with "
+                        "poll_validation using task ids: mysql, webserver")
+            except Exception as e:
+                return f"ERROR: Could not start background validations: {str(e)}"
+
+        def poll_validation(task_id: str) -> str:
+            """
+            Check on a background validation.
+
+            Args:
+                task_id: Task id returned by start_validations_in_background
+                    ('mysql' or 'webserver')
+            """
+            future = self._validation_futures.get(task_id)
+            if future is None:
+                return f"ERROR: No background validation with id '{task_id}'."
+            if not future.done():
+                return f"PENDING: Validation '{task_id}' is still running. Poll again shortly."
+
+            try:
+                result = future.result()
+            except Exception as e:
+                return f"ERROR: Validation '{task_id}' raised: {str(e)}"
+            finally:
+                self._validation_futures.pop(task_id, None)
+
+            if result['status'] == 'success':
+                summary = f"SUCCESS: Validation completed.\n{result['output']}"
+                self._validation_results[task_id] = summary
+                return summary
+            return f"FAILED: Validation failed.\n{result.get('error', 'Unknown error')}"
+
         def get_wordpress_url() -> str:
             """Get the URL where WordPress is accessible."""
-            port = self.config['wordpress']['port']
-            return f"WordPress should be accessible at: http://localhost:{port}"
+            return f"WordPress should be accessible at: http://localhost:{self._wp.port}"
         
         def get_installation_summary() -> str:
             """Get a summary of the installation configuration."""
-            wp = self.config['wordpress']
-            mysql = self.config['mysql']
-            
-            summary = f"""
-                        WordPress Installation Summary:
-                        ================================
-                        WordPress URL: http://localhost:{wp['port']}
-                        WordPress Version: {wp['version']}
-
-                        Database Configuration:
-                        - Database Name: {mysql['database']['name']}
-                        - Database User: {mysql['database']['user']}
-                        - MySQL Version: {mysql['version']}
-
-                        Admin Credentials (for WordPress setup):
-                        - Username: {wp['admin']['user']}
-                        - Email: {wp['admin']['email']}
-                        - Password: {wp['admin']['password']}
-
-                        Docker Configuration:
-                        - Project Name: {self.docker_config['project_name']}
-                        - Compose File: {self.compose_file}
-                        """
-            return summary
+            return self._installation_summary
         
         return self._auto_wrap_tools([
             check_docker_compose_file_exists,
@@ -205,8 +517,11 @@ class OrchestratorAgent(Agent):
             docker_compose_up,
             docker_compose_down,
             docker_compose_restart,
+            validate_all_services,
             validate_mysql_setup,
             validate_webserver_setup,
+            start_validations_in_background,
+            poll_validation,
             get_wordpress_url,
             get_installation_summary
         ])
@@ -231,13 +546,18 @@ class OrchestratorAgent(Agent):
             - Check for existing containers (decide whether to restart or start fresh)
             - Start containers with docker-compose up
             - Wait a bit for containers to initialize
-            - MANDATORY - Call validate_mysql_setup tool
-            - MANDATORY - Call validate_webserver_setup tool
+            - MANDATORY - Call validate_all_services tool (validates MySQL and the
+              web server concurrently)
             - If any validation fails and auto-fix is enabled, try to fix and re-validate
+              (the individual validate_mysql_setup / validate_webserver_setup tools can
+              be used to re-check a single service)
             - Provide final summary
-            
-            IMPORTANT: You MUST call validate_mysql_setup and validate_webserver_setup tools.
-            These tools will wait for containers to be ready, then validate everything.
+
+            IMPORTANT: You MUST validate both services. Prefer the validate_all_services
+            tool - it runs both validations in parallel and is much faster than calling
+            validate_mysql_setup and validate_webserver_setup separately. If you have
+            other useful work to do while validations run, you can instead call
+            start_validations_in_background and collect results with poll_validation.
             Do NOT skip validation steps - they are required for a complete installation.
             
             Use the available tools systematically. Be thorough and handle errors gracefully.
@@ -246,13 +566,16 @@ class OrchestratorAgent(Agent):
             When everything is complete, provide a comprehensive summary with access instructions."""
 
     
-    def run(self, command: str = "install") -> Dict[str, Any]:
+    async def run(self, command: str = "install") -> Dict[str, Any]:
         """
         Run the orchestrator agent.
-        
+
+        Async so callers can drive multiple stacks concurrently; the agent's
+        LLM round-trips no longer block the event loop.
+
         Args:
             command: Command to execute (install, update, or validate)
-            
+
         Returns:
             Dictionary with execution results
         """
@@ -264,12 +587,11 @@ class OrchestratorAgent(Agent):
                 2. Check Docker is running
                 3. Check for existing containers
                 4. Start WordPress stack with docker-compose
-                5. CALL validate_mysql_setup tool (REQUIRED)
-                6. CALL validate_webserver_setup tool (REQUIRED)
-                7. CALL get_installation_summary tool
-                8. Provide final summary with access URL
-                
-                CRITICAL: Steps 5, 6, and 7 are MANDATORY. You must call these tools.""",
+                5. CALL validate_all_services tool (REQUIRED - validates both services in parallel)
+                6. CALL get_installation_summary tool
+                7. Provide final summary with access URL
+
+                CRITICAL: Steps 5 and 6 are MANDATORY. You must call these tools.""",
             
             "update": """Update existing WordPress installation:
                 1. Check current installation status
@@ -281,18 +603,17 @@ class OrchestratorAgent(Agent):
             
             "validate": """Validate existing WordPress installation:
                 1. Check if containers are running
-                2. Validate MySQL setup using the MySQL agent
-                3. Validate Web Server setup using the Web Server agent
-                4. Provide validation report"""
+                2. Validate MySQL and Web Server setups with the validate_all_services tool
+                3. Provide validation report"""
         }
         
         prompt = command_prompts.get(command, command_prompts["install"])
         
         try:
-            result = self.agent.invoke({"input": prompt})
+            result = await self.agent.ainvoke({"input": prompt})
             output = result.get('output', '')
             logger.info(f"Orchestrator Agent completed successfully")
-            
+
             return {
                 "status": "success",
                 "command": command,
@@ -305,3 +626,5 @@ class OrchestratorAgent(Agent):
                 "command": command,
                 "error": str(e)
             }
+        finally:
+            self._discard_background_validations()
@@ -1,96 +1,197 @@
+from __future__ import annotations
+
 import os
+import tempfile
 import yaml
-import docker
 import time
+import threading
 import logging
-from typing import Dict, Any, Optional
-from pathlib import Path
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Union
 
 logger = logging.getLogger(__name__)
 
+# Prefer libyaml's C emitter; fall back to the pure-Python dumper when
+# PyYAML was built without it
+try:
+    from yaml import CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper
+
+# Process-wide Docker client. Building a client runs docker.from_env() plus a
+# ping - a fresh socket connection and HTTP round-trip - and the old
+# per-call pattern paid that for every tool invocation and health poll.
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
 
 def get_docker_client() -> docker.DockerClient:
     """
     Get Docker client instance.
-    
+
+    The client and its daemon connection are created (and pinged) once, then
+    reused process-wide. Call reset_docker_client() after connection-level
+    errors to force a reconnect.
+
     Returns:
         Docker client
     """
-    try:
-        client = docker.from_env()
-        client.ping()
-        return client
-    except Exception as e:
-        logger.error(f"Failed to connect to Docker: {e}")
-        raise
+    global _CLIENT
+    if _CLIENT is not None:
+        return _CLIENT
+
+    # Imported lazily: the docker SDK drags in urllib3 and friends, which
+    # commands that never touch the daemon shouldn't pay for
+    import docker
+
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            try:
+                client = docker.from_env()
+                client.ping()
+                _CLIENT = client
+            except Exception as e:
+                logger.error(f"Failed to connect to Docker: {e}")
+                raise
+        return _CLIENT
+
+
+def reset_docker_client() -> None:
+    """
+    Drop the cached Docker client.
+
+    Use in error-recovery paths (docker.errors.APIError, connection errors)
+    so the next get_docker_client() establishes a fresh connection.
+    """
+    global _CLIENT
+    with _CLIENT_LOCK:
+        _CLIENT = None
 
 
 def check_container_health(container_name: str, timeout: int = 60) -> bool:
     """
     Check if a container is healthy and running.
-    
+
+    Does one inspect up front, then subscribes to the Docker events stream
+    so health is known the instant the daemon emits the transition, rather
+    than up to a poll interval later. Falls back to polling if the events
+    stream is unavailable.
+
     Args:
         container_name: Name of the container
         timeout: Maximum time to wait for health check
-        
+
     Returns:
         True if container is healthy, False otherwise
     """
+    import docker
+
     client = get_docker_client()
-    start_time = time.time()
-    
-    while time.time() - start_time < timeout:
+    deadline = time.time() + timeout
+
+    def _inspect_healthy() -> Optional[bool]:
+        """One-shot inspect; True when conclusively healthy, None to keep waiting."""
         try:
             container = client.containers.get(container_name)
-            if container.status == 'running':
-                # Check health status if available
-                health = container.attrs.get('State', {}).get('Health', {})
-                if health:
-                    if health.get('Status') == 'healthy':
-                        return True
-                else:
-                    # No health check defined, assume healthy if running
-                    return True
-            time.sleep(2)
         except docker.errors.NotFound:
             logger.warning(f"Container {container_name} not found")
-            time.sleep(2)
+            return None
         except Exception as e:
             logger.error(f"Error checking container health: {e}")
-            time.sleep(2)
-    
-    return False
+            return None
 
+        if container.status == 'running':
+            health = container.attrs.get('State', {}).get('Health', {})
+            if not health:
+                # No health check defined, assume healthy if running
+                return True
+            if health.get('Status') == 'healthy':
+                return True
+        return None
 
-def get_container_logs(container_name: str, tail: int = 50) -> str:
+    if _inspect_healthy():
+        return True
+
+    try:
+        events = client.events(
+            decode=True,
+            filters={
+                'container': container_name,
+                'event': ['health_status', 'start', 'die']
+            },
+            since=int(time.time()) - 1,
+            until=int(deadline)
+        )
+        try:
+            for event in events:
+                action = event.get('Action', '')
+                if action.endswith('health_status: healthy'):
+                    return True
+                if action == 'start' and _inspect_healthy():
+                    return True
+                if time.time() >= deadline:
+                    break
+        finally:
+            events.close()
+    except Exception as e:
+        logger.error(f"Error streaming Docker events, falling back to polling: {e}")
+        # Exponential backoff: fast-starting containers are caught within
+        # ~100ms while steady-state polling still settles at one inspect
+        # every 2s
+        delay = 0.1
+        while time.time() < deadline:
+            if _inspect_healthy():
+                return True
+            time.sleep(min(delay, max(deadline - time.time(), 0)))
+            delay = min(delay * 2, 2.0)
+        return False
+
+    # One final inspect in case the transition raced the subscription
+    return bool(_inspect_healthy())
+
+
+def get_container_logs(container_name: str, tail: int = 50, max_bytes: int = 64 * 1024) -> str:
     """
     Get logs from a container.
-    
+
+    Streams log chunks into a bounded buffer instead of materializing and
+    decoding the whole blob, so memory stays constant however large a tail
+    the caller asks for.
+
     Args:
         container_name: Name of the container
         tail: Number of lines to retrieve
-        
+        max_bytes: Upper bound on bytes buffered
+
     Returns:
         Container logs as string
     """
     try:
         client = get_docker_client()
         container = client.containers.get(container_name)
-        logs = container.logs(tail=tail).decode('utf-8')
-        return logs
+
+        buf = bytearray()
+        for chunk in container.logs(tail=tail, stream=True, follow=False):
+            buf.extend(chunk)
+            if len(buf) >= max_bytes or buf.count(b'\n') >= tail:
+                break
+
+        return buf.decode('utf-8', errors='replace')
     except Exception as e:
         logger.error(f"Failed to get logs for {container_name}: {e}")
         return f"Error: {str(e)}"
 
 
-def execute_command_in_container(container_name: str, command: str) -> tuple[int, str]:
+def execute_command_in_container(container_name: str, command: Union[str, List[str]]) -> tuple[int, str]:
     """
     Execute a command inside a container.
-    
+
     Args:
         container_name: Name of the container
-        command: Command to execute
-        
+        command: Command to execute, preferably as an argv list - a list is
+            passed to the daemon unchanged, skipping client-side shell-style
+            splitting and its quoting pitfalls
+
     Returns:
         Tuple of (exit_code, output)
     """
@@ -104,73 +205,259 @@ def execute_command_in_container(container_name: str, command: str) -> tuple[int
         return 1, f"Error: {str(e)}"
 
 
+class PersistentShell:
+    """
+    A long-lived `sh` exec inside a container.
+
+    Each exec_run costs two Docker API round-trips (create + start) plus
+    fresh stdio pipes. This keeps one shell open via the low-level exec
+    socket, so every further command is just a socket write and read. Each
+    command is terminated with a sentinel line carrying its exit code so
+    output boundaries can be recovered from the stream.
+    """
+
+    def __init__(self, container_name: str):
+        client = get_docker_client()
+        exec_id = client.api.exec_create(
+            container_name, ['sh'], stdin=True, tty=False
+        )['Id']
+        self._sock = client.api.exec_start(exec_id, socket=True)
+        self._raw = getattr(self._sock, '_sock', self._sock)
+        self._lock = threading.Lock()
+        self._seq = 0
+
+    def _recv_exact(self, n: int) -> bytes:
+        data = b""
+        while len(data) < n:
+            chunk = self._raw.recv(n - len(data))
+            if not chunk:
+                raise ConnectionError("exec socket closed by daemon")
+            data += chunk
+        return data
+
+    def run(self, cmd: str, timeout: float = 15.0) -> tuple[int, str]:
+        """
+        Run one command in the shell, returning (exit_code, output).
+
+        Output frames arrive in the Docker stream multiplexing format
+        (8-byte header per frame) because the exec has no TTY; frames are
+        demuxed and concatenated until the sentinel appears.
+        """
+        with self._lock:
+            self._seq += 1
+            marker = f"__RC{self._seq}__"
+            self._raw.settimeout(timeout)
+            self._raw.sendall(
+                f"{{ {cmd}\n}} 2>&1\necho {marker}$?__END__\n".encode()
+            )
+
+            buf = bytearray()
+            while True:
+                header = self._recv_exact(8)
+                length = int.from_bytes(header[4:8], 'big')
+                if length:
+                    buf += self._recv_exact(length)
+                text = buf.decode('utf-8', errors='replace')
+                start = text.find(marker)
+                if start != -1 and '__END__' in text[start:]:
+                    break
+
+            output = text[:start]
+            rc_str = text[start + len(marker):].split('__END__', 1)[0]
+            try:
+                rc = int(rc_str)
+            except ValueError:
+                rc = 1
+            return rc, output.strip()
+
+    def close(self) -> None:
+        """Close the exec socket; the shell inside the container exits."""
+        try:
+            self._raw.close()
+        except Exception:
+            pass
+
+
+# One shell per container, shared process-wide like the Docker client
+_SHELLS: Dict[str, PersistentShell] = {}
+_SHELLS_LOCK = threading.Lock()
+
+
+def _get_shell(container_name: str) -> PersistentShell:
+    with _SHELLS_LOCK:
+        shell = _SHELLS.get(container_name)
+        if shell is None:
+            shell = PersistentShell(container_name)
+            _SHELLS[container_name] = shell
+        return shell
+
+
+def _drop_shell(container_name: str) -> None:
+    with _SHELLS_LOCK:
+        shell = _SHELLS.pop(container_name, None)
+    if shell is not None:
+        shell.close()
+
+
+def execute_batch_in_container(container_name: str, commands: Dict[str, str]) -> Dict[str, tuple]:
+    """
+    Execute several commands inside a container with a single exec.
+
+    Multi-command batches go through the shared PersistentShell, so repeat
+    batches against the same container reuse one exec instead of paying
+    create + start round-trips each time. If the shell is unavailable the
+    batch falls back to a one-shot sh invocation where commands are
+    separated with sentinel markers and the combined output is split back
+    per command, with each command's own exit code captured.
+
+    Args:
+        container_name: Name of the container
+        commands: Mapping of label -> shell command
+
+    Returns:
+        Mapping of label -> (exit_code, output). If the batch itself fails
+        to run, every label maps to the same error result.
+    """
+    if len(commands) > 1:
+        try:
+            shell = _get_shell(container_name)
+            return {label: shell.run(cmd) for label, cmd in commands.items()}
+        except Exception as e:
+            logger.warning(
+                f"Persistent shell unavailable for {container_name}, "
+                f"falling back to one-shot exec: {e}"
+            )
+            _drop_shell(container_name)
+
+    sentinel = "__BATCH_TAG__"
+    script_parts = []
+    for label, cmd in commands.items():
+        script_parts.append(f"echo '{sentinel}:{label}'")
+        script_parts.append(f"{cmd} 2>&1; echo '{sentinel}_RC:'$?")
+    script = "\n".join(script_parts)
+
+    exit_code, output = execute_command_in_container(container_name, ["sh", "-c", script])
+
+    if sentinel not in output:
+        return {label: (exit_code or 1, output) for label in commands}
+
+    results = {}
+    for chunk in output.split(f"{sentinel}:")[1:]:
+        label, _, body = chunk.partition("\n")
+        label = label.strip()
+        body, _, rc_part = body.rpartition(f"{sentinel}_RC:")
+        try:
+            rc = int(rc_part.strip().splitlines()[0])
+        except (ValueError, IndexError):
+            rc = exit_code
+        results[label] = (rc, body.strip())
+
+    for label in commands:
+        results.setdefault(label, (1, "Error: no output captured for this command"))
+
+    return results
+
+
+@lru_cache(maxsize=8)
+def _render_compose(wp_version: str, wp_port: int, mysql_version: str,
+                    db_name: str, db_user: str, db_password: str,
+                    root_password: str) -> str:
+    """
+    Render the compose YAML for one configuration.
+
+    Builds a dict mirroring the compose schema and dumps it through the YAML
+    emitter, so values containing ':'/newlines (e.g. passwords) are quoted
+    correctly rather than spliced into a template string. Cached so repeated
+    identical configs skip the re-render.
+    """
+    compose = {
+        'version': '3.8',
+        'services': {
+            'mysql': {
+                'image': f"mysql:{mysql_version}",
+                'container_name': 'wordpress_mysql',
+                'restart': 'unless-stopped',
+                'environment': {
+                    'MYSQL_ROOT_PASSWORD': root_password,
+                    'MYSQL_DATABASE': db_name,
+                    'MYSQL_USER': db_user,
+                    'MYSQL_PASSWORD': db_password,
+                },
+                'volumes': ['mysql_data:/var/lib/mysql'],
+                'networks': ['wordpress_network'],
+                'healthcheck': {
+                    'test': ['CMD', 'mysqladmin', 'ping', '-h', 'localhost',
+                             '-u', 'root', f'-p{root_password}'],
+                    'interval': '10s',
+                    'timeout': '5s',
+                    'retries': 5,
+                },
+            },
+            'wordpress': {
+                'image': f"wordpress:{wp_version}",
+                'container_name': 'wordpress_app',
+                'restart': 'unless-stopped',
+                'depends_on': {'mysql': {'condition': 'service_healthy'}},
+                'ports': [f"{wp_port}:80"],
+                'environment': {
+                    'WORDPRESS_DB_HOST': 'mysql:3306',
+                    'WORDPRESS_DB_NAME': db_name,
+                    'WORDPRESS_DB_USER': db_user,
+                    'WORDPRESS_DB_PASSWORD': db_password,
+                },
+                'volumes': ['wordpress_data:/var/www/html'],
+                'networks': ['wordpress_network'],
+                'healthcheck': {
+                    'test': ['CMD', 'curl', '-f', 'http://localhost:80/'],
+                    'interval': '10s',
+                    'timeout': '5s',
+                    'retries': 5,
+                },
+            },
+        },
+        'volumes': {'mysql_data': None, 'wordpress_data': None},
+        'networks': {'wordpress_network': {'driver': 'bridge'}},
+    }
+
+    return yaml.dump(compose, Dumper=_YamlDumper, sort_keys=False,
+                     default_flow_style=False)
+
+
 def create_docker_compose_file(config: Dict[str, Any], output_path: str = "docker-compose.yml") -> None:
     """
     Create docker-compose.yml file based on configuration.
-    
+
     Args:
         config: Configuration dictionary
         output_path: Path where to save the docker-compose file
     """
     wordpress_config = config['wordpress']
     mysql_config = config['mysql']
-    
-    compose_content = f"""version: '3.8'
-
-services:
-  mysql:
-    image: mysql:{mysql_config['version']}
-    container_name: wordpress_mysql
-    restart: unless-stopped
-    environment:
-      MYSQL_ROOT_PASSWORD: {mysql_config['database']['root_password']}
-      MYSQL_DATABASE: {mysql_config['database']['name']}
-      MYSQL_USER: {mysql_config['database']['user']}
-      MYSQL_PASSWORD: {mysql_config['database']['password']}
-    volumes:
-      - mysql_data:/var/lib/mysql
-    networks:
-      - wordpress_network
-    healthcheck:
-      test: ["CMD", "mysqladmin", "ping", "-h", "localhost", "-u", "root", "-p{mysql_config['database']['root_password']}"]
-      interval: 10s
-      timeout: 5s
-      retries: 5
-
-  wordpress:
-    image: wordpress:{wordpress_config['version']}
-    container_name: wordpress_app
-    restart: unless-stopped
-    depends_on:
-      mysql:
-        condition: service_healthy
-    ports:
-      - "{wordpress_config['port']}:80"
-    environment:
-      WORDPRESS_DB_HOST: mysql:3306
-      WORDPRESS_DB_NAME: {mysql_config['database']['name']}
-      WORDPRESS_DB_USER: {mysql_config['database']['user']}
-      WORDPRESS_DB_PASSWORD: {mysql_config['database']['password']}
-    volumes:
-      - wordpress_data:/var/www/html
-    networks:
-      - wordpress_network
-    healthcheck:
-      test: ["CMD", "curl", "-f", "http://localhost:80/"]
-      interval: 10s
-      timeout: 5s
-      retries: 5
-
-volumes:
-  mysql_data:
-  wordpress_data:
-
-networks:
-  wordpress_network:
-    driver: bridge
-"""
-    
-    with open(output_path, 'w') as f:
-        f.write(compose_content)
-    
+
+    compose_content = _render_compose(
+        wp_version=wordpress_config['version'],
+        wp_port=wordpress_config['port'],
+        mysql_version=mysql_config['version'],
+        db_name=mysql_config['database']['name'],
+        db_user=mysql_config['database']['user'],
+        db_password=mysql_config['database']['password'],
+        root_password=mysql_config['database']['root_password'],
+    )
+
+    # Write to a temp file in the same directory and rename into place, so
+    # an interrupted write can never leave a truncated compose file for a
+    # later docker compose up to trip over
+    directory = os.path.dirname(os.path.abspath(output_path))
+    tmp = tempfile.NamedTemporaryFile('w', dir=directory, delete=False)
+    try:
+        with tmp:
+            tmp.write(compose_content)
+        os.replace(tmp.name, output_path)
+    except Exception:
+        try:
+            os.unlink(tmp.name)
+        except OSError:
+            pass
+        raise
+
     logger.info(f"Docker Compose file created at {output_path}")
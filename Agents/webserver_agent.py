@@ -1,21 +1,38 @@
+import asyncio
 import logging
 import time
 import requests
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, Optional, Tuple
 from .utils import (
     get_docker_client,
     check_container_health,
     get_container_logs,
-    execute_command_in_container
+    execute_command_in_container,
+    execute_batch_in_container
 )
 from .agent import Agent
 
 logger = logging.getLogger(__name__)
 
+# Shared session for the localhost HTTP probes. Pooled keep-alive connections
+# avoid a fresh TCP handshake per probe across repeated validation loops.
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(
+    pool_connections=2,
+    pool_maxsize=4,
+    max_retries=Retry(total=2, backoff_factor=0.2)
+))
+
 
 class WebServerAgent(Agent):
     """Agent responsible for web server and PHP configuration."""
-    
+
+    # Narrow check-fix-recheck flow; doesn't need the base 15 iterations
+    default_max_iterations = 6
+
     def __init__(self, llm, config: Dict[str, Any]):
         """
         Initialize Web Server Agent.
@@ -27,19 +44,67 @@ class WebServerAgent(Agent):
         self.wordpress_config = config['wordpress']
         self.container_name = "wordpress_app"
         self.port = self.wordpress_config['port']
+        self._inspect_cache: Optional[Tuple[float, Dict[str, Any]]] = None
         super().__init__(llm, config, agent_name="WebServerAgent")
 
-    
+    def _inspect(self, ttl: float = 2.0) -> Dict[str, Any]:
+        """
+        Return the container's inspect JSON, cached for a short TTL.
+
+        containers.get() is a full /containers/{id}/json round-trip; tools
+        that each need a field or two share one snapshot per TTL window
+        instead of hitting the daemon separately.
+        """
+        now = time.monotonic()
+        if self._inspect_cache is not None:
+            ts, attrs = self._inspect_cache
+            if now - ts < ttl:
+                return attrs
+
+        client = get_docker_client()
+        attrs = client.containers.get(self.container_name).attrs
+        self._inspect_cache = (now, attrs)
+        return attrs
+
+
     def _create_tools(self):
         """Create tools for Web Server agent."""
-        
+
+        # Results of the batched container diagnostics, shared across the
+        # individual tools for a few seconds; cleared by the restart tools.
+        diagnostics_cache = {}
+
+        def _get_diagnostics(ttl: float = 3.0) -> dict:
+            """
+            Run the container diagnostics as one batched exec.
+
+            php -v, apache2ctl -t, the file listing and php -m are four
+            independent exec round-trips when run separately; one sh batch
+            fetches them all in a single pass. Results are shared across the
+            tools within one reasoning turn via a short TTL - long enough to
+            dedupe calls in a turn, short enough that a re-validation after a
+            stack restart sees fresh state.
+            """
+            now = time.monotonic()
+            if diagnostics_cache and now - diagnostics_cache['ts'] < ttl:
+                return diagnostics_cache['results']
+
+            results = execute_batch_in_container(self.container_name, {
+                'php_version': "php -v",
+                'apache_config': "apache2ctl -t",
+                'wordpress_files': "ls -la /var/www/html/ | head -20",
+                'php_extensions': "php -m",
+            })
+            diagnostics_cache['ts'] = now
+            diagnostics_cache['results'] = results
+            return results
+
         def check_wordpress_container_status() -> str:
             """Check if WordPress container is running and healthy."""
             try:
-                client = get_docker_client()
-                container = client.containers.get(self.container_name)
-                status = container.status
-                health = container.attrs.get('State', {}).get('Health', {}).get('Status', 'N/A')
+                state = self._inspect().get('State', {})
+                status = state.get('Status', 'unknown')
+                health = state.get('Health', {}).get('Status', 'N/A')
                 return f"Container status: {status}, Health: {health}"
             except Exception as e:
                 return f"Error checking container: {str(e)}"
@@ -57,7 +122,7 @@ class WebServerAgent(Agent):
             """Test if WordPress responds to HTTP requests."""
             try:
                 url = f"http://localhost:{self.port}"
-                response = requests.get(url, timeout=10)
+                response = _SESSION.get(url, timeout=10)
                 return f"SUCCESS: HTTP {response.status_code} - WordPress is responding. Content length: {len(response.content)} bytes"
             except requests.exceptions.ConnectionError:
                 return "FAILED: Cannot connect to WordPress. Connection refused."
@@ -68,9 +133,9 @@ class WebServerAgent(Agent):
         
         def check_php_version() -> str:
             """Check PHP version installed in WordPress container."""
-            command = "php -v"
-            exit_code, output = execute_command_in_container(self.container_name, command)
-            
+            exit_code, output = _get_diagnostics()['php_version']
+
+
             if exit_code == 0:
                 return f"SUCCESS: PHP version info:\n{output}"
             else:
@@ -78,9 +143,9 @@ class WebServerAgent(Agent):
         
         def check_apache_status() -> str:
             """Check Apache web server status."""
-            command = "apache2ctl -t"
-            exit_code, output = execute_command_in_container(self.container_name, command)
-            
+            exit_code, output = _get_diagnostics()['apache_config']
+
+
             if exit_code == 0:
                 return f"SUCCESS: Apache configuration is valid:\n{output}"
             else:
@@ -88,9 +153,9 @@ class WebServerAgent(Agent):
         
         def verify_wordpress_files() -> str:
             """Verify WordPress files are present."""
-            command = "ls -la /var/www/html/ | head -20"
-            exit_code, output = execute_command_in_container(self.container_name, command)
-            
+            exit_code, output = _get_diagnostics()['wordpress_files']
+
+
             if exit_code == 0:
                 if "wp-config.php" in output or "wp-admin" in output:
                     return f"SUCCESS: WordPress files are present:\n{output}"
@@ -101,14 +166,19 @@ class WebServerAgent(Agent):
         
         def check_php_extensions() -> str:
             """Check if required PHP extensions are loaded."""
-            command = "php -m"
-            exit_code, output = execute_command_in_container(self.container_name, command)
-            
+            exit_code, output = _get_diagnostics()['php_extensions']
+
+
             if exit_code == 0:
-                required = ['mysqli', 'gd', 'curl', 'zip', 'mbstring']
-                loaded = output.lower()
-                missing = [ext for ext in required if ext not in loaded]
-                
+                # php -m prints one module per line (plus [section] headers);
+                # exact name matching avoids substring false positives
+                loaded_set = {
+                    line.strip().lower()
+                    for line in output.splitlines()
+                    if line.strip() and '[' not in line
+                }
+                missing = sorted({'mysqli', 'gd', 'curl', 'zip', 'mbstring'} - loaded_set)
+
                 if not missing:
                     return f"SUCCESS: All required PHP extensions are loaded:\n{output}"
                 else:
@@ -120,7 +190,7 @@ class WebServerAgent(Agent):
             """Test if WordPress installation page is accessible."""
             try:
                 url = f"http://localhost:{self.port}/wp-admin/install.php"
-                response = requests.get(url, timeout=10, allow_redirects=True)
+                response = _SESSION.get(url, timeout=10, allow_redirects=True)
                 
                 if response.status_code == 200:
                     if "WordPress" in response.text or "installation" in response.text.lower():
@@ -134,7 +204,8 @@ class WebServerAgent(Agent):
         
         def restart_apache() -> str:
             """Restart Apache web server inside the container."""
-            command = "apache2ctl graceful"
+            diagnostics_cache.clear()
+            command = ["apache2ctl", "graceful"]
             exit_code, output = execute_command_in_container(self.container_name, command)
             
             if exit_code == 0:
@@ -144,16 +215,53 @@ class WebServerAgent(Agent):
         
         def restart_wordpress_container() -> str:
             """Restart the WordPress container."""
+            diagnostics_cache.clear()
+            self._inspect_cache = None
             try:
                 client = get_docker_client()
                 container = client.containers.get(self.container_name)
                 container.restart()
-                time.sleep(5)
-                return "WordPress container restarted successfully."
+                # Wait on the docker events stream rather than a fixed sleep:
+                # fast restarts return immediately, slow ones get up to 30s
+                if check_container_health(self.container_name, timeout=30):
+                    return "WordPress container restarted successfully and is healthy."
+                return "WARNING: WordPress container restarted but did not report healthy within 30s."
             except Exception as e:
                 return f"Failed to restart WordPress container: {str(e)}"
         
+        def run_all_probes() -> str:
+            """Run every web server probe concurrently and return one combined report. Prefer this over calling the individual probe tools one by one."""
+            probes = [
+                ("Container status", check_wordpress_container_status),
+                ("HTTP response", test_http_response),
+                ("Installation page", test_wordpress_installation_page),
+                ("WordPress files", verify_wordpress_files),
+                ("PHP version", check_php_version),
+                ("PHP extensions", check_php_extensions),
+                ("Apache status", check_apache_status),
+            ]
+
+            # Warm the batched diagnostics once up front so the exec-backed
+            # probes don't race to run the same batch concurrently
+            try:
+                _get_diagnostics()
+            except Exception as e:
+                logger.error(f"Failed to pre-fetch container diagnostics: {e}")
+
+            sections = []
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                futures = [(title, pool.submit(fn)) for title, fn in probes]
+                for title, future in futures:
+                    try:
+                        result = future.result(timeout=15)
+                    except Exception as e:
+                        result = f"ERROR: {str(e)}"
+                    sections.append(f"=== {title} ===\n{result}")
+
+            return "\n\n".join(sections)
+
         return self._auto_wrap_tools([
+            run_all_probes,
             check_wordpress_container_status,
             get_wordpress_logs,
             test_http_response,
@@ -180,27 +288,34 @@ class WebServerAgent(Agent):
             7. Fix any issues found
             8. Report the final status
             
+            Start with run_all_probes - it runs every diagnostic concurrently and returns one
+            combined report. Only fall back to the individual tools when you need to re-check
+            a single item after a fix.
+
             Use the available tools to diagnose and fix issues. Always verify your fixes worked.
             Be systematic and thorough. If something fails, analyze the logs and try to fix it.
             
             When you've completed all checks and any necessary fixes, provide a final summary report."""
     
-    def validate_and_fix(self) -> Dict[str, Any]:
+    async def validate_and_fix(self) -> Dict[str, Any]:
         """
         Run validation and fix any issues.
-        
+
+        Async so multiple agents (or stacks) can validate concurrently without
+        blocking the caller's event loop on LLM round-trips.
+
         Returns:
             Dictionary with status and details
         """
         logger.info("Web Server Agent: Starting validation...")
-        
+
         try:
             # Wait for container to be ready
             logger.info("Waiting for WordPress container to be healthy...")
-            if not check_container_health(self.container_name, timeout=60):
+            if not await asyncio.to_thread(check_container_health, self.container_name, 60):
                 logger.warning("WordPress container health check timed out, proceeding anyway...")
-            
-            result = self.agent.invoke({
+
+            result = await self.agent.ainvoke({
                 "input": f"""Perform a complete validation of the web server and PHP setup:
                 1. Check container status
                 2. Verify Apache is running
@@ -1,47 +1,78 @@
 #!/usr/bin/env python3
 import sys
+import asyncio
 import argparse
+import functools
 import logging
-from pathlib import Path
+import shutil
+import subprocess
 from colorama import Fore, Style, init
 from utils import load_config, setup_logging, get_llm_from_config
-from Agents.orchestrator_agent import OrchestratorAgent
 
 # Initialize colorama for colored output
 init(autoreset=True)
 
 logger = logging.getLogger(__name__)
 
+# Precomputed ANSI prefixes/suffix - colorama's Fore/Style lookups and the
+# per-call f-string assembly are paid once here instead of on every print
+_GREEN = Fore.GREEN
+_RED = Fore.RED
+_YELLOW = Fore.YELLOW
+_CYAN = Fore.CYAN
+_WHITE = Fore.WHITE
+_RESET = Style.RESET_ALL
+_PREFIX_OK = f"{_GREEN}✓ "
+_PREFIX_ERR = f"{_RED}✗ "
+_PREFIX_INFO = f"{_YELLOW}ℹ "
+_CYAN_RULE = f"{_CYAN}{'=' * 60}{_RESET}"
+_GREEN_RULE = f"{_GREEN}{'=' * 60}{_RESET}"
+
 
 def print_success(message: str):
     """Print success message."""
-    print(f"{Fore.GREEN}✓ {message}{Style.RESET_ALL}")
+    print(_PREFIX_OK + message + _RESET)
 
 
 def print_error(message: str):
     """Print error message."""
-    print(f"{Fore.RED}✗ {message}{Style.RESET_ALL}")
+    print(_PREFIX_ERR + message + _RESET)
 
 
 def print_info(message: str):
     """Print info message."""
-    print(f"{Fore.YELLOW}ℹ {message}{Style.RESET_ALL}")
+    print(_PREFIX_INFO + message + _RESET)
+
+
+@functools.lru_cache(maxsize=None)
+def _which(cmd: str) -> bool:
+    """Cached shutil.which - each lookup walks PATH with a stat per entry."""
+    return shutil.which(cmd) is not None
+
+
+@functools.lru_cache(maxsize=1)
+def _compose_available() -> bool:
+    """Check for the standalone docker-compose binary or the compose plugin."""
+    if _which('docker-compose'):
+        return True
+    try:
+        result = subprocess.run(
+            ['docker', 'compose', 'version'],
+            capture_output=True
+        )
+        return result.returncode == 0
+    except OSError:
+        return False
 
 
 def validate_requirements():
     """Validate that required tools are installed."""
-    import shutil
-    
-    requirements = {
-        'docker': 'Docker',
-        'docker-compose': 'Docker Compose'
-    }
-    
     missing = []
-    for cmd, name in requirements.items():
-        if not shutil.which(cmd):
-            missing.append(name)
-    
+    if not _which('docker'):
+        missing.append('Docker')
+    if not _compose_available():
+        missing.append('Docker Compose')
+
     if missing:
         print_error(f"Missing required tools: {', '.join(missing)}")
         print_info("Please install Docker and Docker Compose before running this application.")
@@ -91,14 +122,15 @@ def main():
             return 1
         print_success("System requirements validated")
         
-        # Load configuration
+        # Load configuration; a missing file surfaces as FileNotFoundError
+        # from the open itself, so no separate exists() stat is needed
         print_info(f"Loading configuration from {args.config}...")
-        if not Path(args.config).exists():
+        try:
+            config = load_config(args.config)
+        except FileNotFoundError:
             print_error(f"Configuration file not found: {args.config}")
             return 1
         
-        config = load_config(args.config)
-        
         # Override verbosity if specified
         if args.verbose:
             config['agents']['verbose'] = True
@@ -120,42 +152,45 @@ def main():
             print_info("Please check your API key in the configuration or environment variables.")
             return 1
         
-        # Create orchestrator agent
+        # Create orchestrator agent. Imported here rather than at module
+        # level so --help and argument errors don't pay the langchain
+        # import chain.
         print_info("Creating orchestrator agent...")
+        from Agents.orchestrator_agent import OrchestratorAgent
         orchestrator = OrchestratorAgent(llm, config)
         print_success("Orchestrator agent ready")
         
         # Execute command
-        print(f"\n{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}Executing: {args.command.upper()}{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}\n")
-        
-        result = orchestrator.run(args.command)
-        
+        print(f"\n{_CYAN_RULE}")
+        print(f"{_CYAN}Executing: {args.command.upper()}{_RESET}")
+        print(f"{_CYAN_RULE}\n")
+
+        result = asyncio.run(orchestrator.run(args.command))
+
         # Print results
-        print(f"\n{Fore.CYAN}{'='*60}{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}RESULTS{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}{'='*60}{Style.RESET_ALL}\n")
-        
+        print(f"\n{_CYAN_RULE}")
+        print(f"{_CYAN}RESULTS{_RESET}")
+        print(f"{_CYAN_RULE}\n")
+
         if result['status'] == 'success':
             print_success(f"Command '{args.command}' completed successfully!")
-            print(f"\n{Fore.WHITE}{result['output']}{Style.RESET_ALL}\n")
-            
+            print(f"\n{_WHITE}{result['output']}{_RESET}\n")
+
             # Print access information
             wp_port = config['wordpress']['port']
-            print(f"{Fore.GREEN}{'='*60}{Style.RESET_ALL}")
-            print(f"{Fore.GREEN}WordPress is now accessible at:{Style.RESET_ALL}")
-            print(f"{Fore.GREEN}http://localhost:{wp_port}{Style.RESET_ALL}")
-            print(f"{Fore.GREEN}{'='*60}{Style.RESET_ALL}\n")
-            
+            print(_GREEN_RULE)
+            print(f"{_GREEN}WordPress is now accessible at:{_RESET}")
+            print(f"{_GREEN}http://localhost:{wp_port}{_RESET}")
+            print(f"{_GREEN_RULE}\n")
+
             return 0
         else:
             print_error(f"Command '{args.command}' failed!")
-            print(f"\n{Fore.RED}Error: {result.get('error', 'Unknown error')}{Style.RESET_ALL}\n")
+            print(f"\n{_RED}Error: {result.get('error', 'Unknown error')}{_RESET}\n")
             return 1
-    
+
     except KeyboardInterrupt:
-        print(f"\n{Fore.YELLOW}Operation cancelled by user.{Style.RESET_ALL}")
+        print(f"\n{_YELLOW}Operation cancelled by user.{_RESET}")
         return 130
     except Exception as e:
         print_error(f"Unexpected error: {str(e)}")
@@ -1,33 +1,61 @@
+import functools
+import json
 import os
+import re
 import yaml
-import docker
-import time
 import logging
 from typing import Dict, Any, Optional
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Matches ${VAR_NAME} placeholders for environment substitution
+_ENV_RE = re.compile(r'\$\{([A-Za-z_][A-Za-z0-9_]*)\}')
+
+# Prefer libyaml's C tokenizer (5-20x faster); fall back to the pure-Python
+# loader when PyYAML was built without it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# Parsed configs keyed on (absolute path, mtime_ns); edits to the file
+# invalidate the entry, repeat loads within a process skip the parse
+_CONFIG_CACHE: Dict[tuple, Dict[str, Any]] = {}
+
 
 def load_config(config_path: str = "config.yaml") -> Dict[str, Any]:
     """
     Load configuration from YAML file with environment variable substitution.
-    
+
     Args:
         config_path: Path to the configuration file
-        
+
     Returns:
         Dictionary containing configuration
+
+    Raises:
+        FileNotFoundError: If the configuration file does not exist
     """
+    path = os.path.abspath(config_path)
+    cache_key = (path, os.stat(path).st_mtime_ns)
+    cached = _CONFIG_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
 
-    with open(config_path, 'r') as f:
+    with open(path, 'r') as f:
         config_str = f.read()
-    
-    # Replace environment variables
-    for key, value in os.environ.items():
-        config_str = config_str.replace(f"${{{key}}}", value)
-    
-    config = yaml.safe_load(config_str)
+
+    # Replace ${VAR} placeholders in one pass; unknown variables are left
+    # as-is rather than scanning the whole file once per environment entry
+    config_str = _ENV_RE.sub(
+        lambda m: os.environ.get(m.group(1), m.group(0)),
+        config_str
+    )
+
+    config = yaml.load(config_str, Loader=_YamlLoader)
+    _CONFIG_CACHE.clear()
+    _CONFIG_CACHE[cache_key] = config
     return config
 
 
@@ -38,34 +66,52 @@ def setup_logging(config: Dict[str, Any]) -> None:
     Args:
         config: Configuration dictionary
     """
+    import atexit
+    import logging.handlers
+
     log_config = config.get('logging', {})
     level = getattr(logging, log_config.get('level', 'INFO'))
     log_format = log_config.get('format', '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     log_file = log_config.get('file', 'wordpress_manager.log')
-    
+
+    # Buffer file records in memory and flush in batches; a bare FileHandler
+    # issues a write() per record, which adds up in tight polling loops.
+    # Errors (and shutdown) flush immediately so nothing important is held back.
+    # The target needs its own formatter: basicConfig only formats the
+    # handlers it is given, and MemoryHandler.flush() hands records straight
+    # to the target.
+    file_handler = logging.FileHandler(log_file)
+    file_handler.setFormatter(logging.Formatter(log_format))
+    buffered_handler = logging.handlers.MemoryHandler(
+        capacity=1024,
+        flushLevel=logging.ERROR,
+        target=file_handler,
+        flushOnClose=True
+    )
+    atexit.register(buffered_handler.flush)
+
     logging.basicConfig(
         level=level,
         format=log_format,
         handlers=[
-            logging.FileHandler(log_file),
+            buffered_handler,
             logging.StreamHandler()
         ]
     )
 
 
-def get_llm_from_config(config: Dict[str, Any]):
+@functools.lru_cache(maxsize=1)
+def _build_llm(llm_config_json: str):
     """
-    Initialize LLM based on configuration.
-    
-    Args:
-        config: Configuration dictionary
-        
-    Returns:
-        LangChain LLM instance
+    Construct the chat model for one serialized llm config.
+
+    Cached so every agent built from the same config shares one instance -
+    and with it one HTTP client and connection pool to the provider -
+    instead of each opening its own.
     """
-    llm_config = config['llm']
+    llm_config = json.loads(llm_config_json)
     provider = llm_config['provider'].lower()
-    
+
     if provider == 'anthropic':
         from langchain_anthropic import ChatAnthropic
         return ChatAnthropic(
@@ -84,3 +130,17 @@ def get_llm_from_config(config: Dict[str, Any]):
         )
     else:
         raise ValueError(f"Unsupported LLM provider: {provider}")
+
+
+def get_llm_from_config(config: Dict[str, Any]):
+    """
+    Initialize LLM based on configuration.
+
+    Args:
+        config: Configuration dictionary
+
+    Returns:
+        LangChain LLM instance
+    """
+    # Keyed on the serialized llm section since dicts aren't hashable
+    return _build_llm(json.dumps(config['llm'], sort_keys=True))